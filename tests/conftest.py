@@ -147,13 +147,73 @@ def setup_test_environment() -> Generator[None, None, None]:
         os.environ.clear()
         os.environ.update(original_env)
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session", autouse=True)
+def disable_icecream() -> Generator[None, None, None]:
+    """
+    Turn the application's ic() debug output off for the test session.
+
+    The first ic() call from a module parses that module's source to label
+    its output, which made it the slowest step of tests such as
+    test_generate_exam (about 0.4s, against 0.01s with ic disabled). ic()
+    still returns its argument when disabled, and tests that check the
+    logging patch ic directly, so they are unaffected.
+    """
+    from icecream import ic
+
+    ic.disable()
+    try:
+        yield
+    finally:
+        ic.enable()
+
+@pytest.fixture(scope="session")
+def anyio_backend() -> str:
+    """
+    Event loop backend for tests marked with pytest.mark.anyio.
+
+    anyio's plugin would otherwise run each of those tests once per backend
+    it knows; asyncio is the only one the application runs on.
+    """
+    return "asyncio"
+
+_COGNITO_TOKEN_CLAIMS = {
+    "sub": "test-cognito-id",
+    "email": "test@example.com",
+    "token_use": "id",
+    "iss": "https://cognito-idp.eu-central-1.amazonaws.com/eu-central-1_1234567890",
+    "cognito:username": "Test User"
+}
+
+class _StubValidator:
+    """Token validator that always returns the given payload."""
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    async def validate_token(self, *args, **kwargs):
+        return self.payload
+
+@pytest.fixture(scope="session")
 def mock_cognito_token_payload():
+    # Built once: no test mutates the payload, it is only handed back by the
+    # stubbed validators.
     from utility.tokens import CognitoTokenPayload
-    return CognitoTokenPayload(**{
-        "sub": "test-cognito-id",
-        "email": "test@example.com",
-        "token_use": "id",
-        "iss": "https://cognito-idp.eu-central-1.amazonaws.com/eu-central-1_1234567890",
-        "cognito:username": "Test User"
-    })
\ No newline at end of file
+    return CognitoTokenPayload(**_COGNITO_TOKEN_CLAIMS)
+
+@pytest.fixture(scope="session")
+def mock_cognito_auth(mock_cognito_token_payload):
+    """
+    Session-wide stub for Cognito token validation.
+
+    Requested by the shared router and app clients, so the patches are
+    entered once for the session instead of by every router test; tests
+    that need other claims can still patch on top of these. Tests that do
+    not go through those clients keep the real validation path.
+    """
+    from utility import auth
+
+    validator = _StubValidator(mock_cognito_token_payload)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("utility.auth.jose_jwt.get_unverified_claims", lambda *_: {"cognito:username": "dummy_user_id"})
+        mp.setitem(auth.VALIDATOR_MAP, "cognito", validator)
+        yield validator
\ No newline at end of file
@@ -0,0 +1,82 @@
+# 
+# Copyright 2025 EDT&Partners
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# 
+
+"""
+Shared FastAPI test apps and patch helpers for the router unit tests.
+"""
+
+from types import ModuleType
+
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI
+
+# Keyed by router identity: APIRouter is unhashable, and the routers are
+# module-level singletons that live for the whole test session.
+_APPS: dict[tuple[int, str], FastAPI] = {}
+_CLIENTS: dict[int, httpx.AsyncClient] = {}
+
+
+def get_app(router: APIRouter, prefix: str = "") -> FastAPI:
+    """
+    Return a FastAPI app with ``router`` mounted, building it only once.
+
+    Repeated calls for the same router (e.g. on module re-import) reuse the
+    cached app instead of walking and re-registering every route again.
+
+    The app keeps the router's response models and FastAPI's default
+    JSONResponse, as in production: the tests assert on the validated and
+    filtered response bodies, so neither is swapped out for speed.
+    """
+    key = (id(router), prefix)
+    if key not in _APPS:
+        app = FastAPI()
+        app.include_router(router, prefix=prefix)
+        _APPS[key] = app
+    return _APPS[key]
+
+
+def get_client(app: FastAPI) -> httpx.AsyncClient:
+    """
+    Return the in-process AsyncClient for ``app``, building it only once.
+
+    Module globals are per process, so under pytest-xdist every worker keeps
+    a single client per app, shared by all the test modules that use it.
+    """
+    if id(app) not in _CLIENTS:
+        # The client is deliberately not entered as a context manager:
+        # ASGITransport only sends HTTP scopes, so no lifespan startup or
+        # shutdown runs for the router tests.
+        _CLIENTS[id(app)] = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://testserver",
+            follow_redirects=True,
+        )
+    return _CLIENTS[id(app)]
+
+
+async def close_clients() -> None:
+    """Close every cached AsyncClient and empty the cache."""
+    clients = list(_CLIENTS.values())
+    _CLIENTS.clear()
+    for client in clients:
+        await client.aclose()
+
+
+def patch_attrs(monkeypatch: pytest.MonkeyPatch, module: ModuleType, **attrs) -> None:
+    """Monkeypatch several attributes of ``module`` in one call."""
+    for name, value in attrs.items():
+        monkeypatch.setattr(module, name, value)
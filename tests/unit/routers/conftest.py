@@ -0,0 +1,71 @@
+# 
+# Copyright 2025 EDT&Partners
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# 
+
+"""
+Shared fixtures for the router unit tests.
+
+The per-router clients are wired up here. ``router_client_factory`` also
+requests ``mock_cognito_auth`` from tests/conftest.py, so token validation
+is stubbed for every test that uses one of these clients.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+
+from database.db import get_db
+from utility.auth import oauth2_scheme
+from tests.unit.routers._app import close_clients, get_app, get_client
+
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
+
+# The router CRUD calls are all monkeypatched, so no test inspects the db
+# handle; a single shared mock serves every router.
+_DB_SENTINEL = MagicMock(name="db")
+
+
+@pytest.fixture(scope="session")
+def event_loop_policy():
+    # Run the async router tests' ASGI round-trips on uvloop when installed.
+    return uvloop.EventLoopPolicy() if uvloop else asyncio.DefaultEventLoopPolicy()
+
+
+@pytest.fixture(scope="session")
+def router_client_factory(mock_cognito_auth):
+    """
+    Return a callable that maps a router to its shared AsyncClient.
+
+    Every module that asks for the same router gets the same client, so the
+    app and its transport are built once for the whole test session.
+
+    The database and bearer-token dependencies are overridden the first time
+    a router is requested and restored when the session ends, after the
+    cached clients have been closed.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        def factory(router):
+            app = get_app(router)
+            if get_db not in app.dependency_overrides:
+                mp.setitem(app.dependency_overrides, get_db, lambda: _DB_SENTINEL)
+                mp.setitem(app.dependency_overrides, oauth2_scheme, lambda: "fake-jwt-token")
+            return get_client(app)
+        yield factory
+        # The test event loops are gone by now; ASGITransport holds no
+        # loop-bound resources, so a fresh loop can close the clients.
+        asyncio.run(close_clients())
@@ -16,129 +16,92 @@
 
 import uuid
 import pytest
-from fastapi import FastAPI
-from fastapi.testclient import TestClient
-from unittest.mock import MagicMock, AsyncMock, patch
-import os
+from io import BytesIO
+from types import SimpleNamespace
 
 from routers import groups
-from routers.groups import router, get_db
-from utility.auth import oauth2_scheme
+from routers.groups import router
+from tests.unit.routers._app import patch_attrs
 from database.models import UserRole
 
-app = FastAPI()
-app.include_router(router)
+pytestmark = pytest.mark.asyncio
 
-@pytest.fixture(scope="function")
-def client(mock_cognito_token_payload):
-    app.dependency_overrides[get_db] = lambda: MagicMock()
-    app.dependency_overrides[oauth2_scheme] = lambda: "fake-jwt-token"
+# Fixed IDs: the tests only need distinct values, not random ones.
+GID = uuid.UUID(int=1)
+UID = uuid.UUID(int=2)
+OTHER_GID = uuid.UUID(int=3)
+SERVICE_IDS = (uuid.UUID(int=4), uuid.UUID(int=5))
 
-    with patch("utility.auth.jose_jwt.get_unverified_claims") as mock_get_claims:
-    
-        mock_get_claims.return_value = {"cognito:username": "dummy_user_id"}
+def admin_user(group_id=None):
+    return SimpleNamespace(role=UserRole.admin, group_id=group_id)
 
-        mock_validator = AsyncMock()
-        mock_validator.validate_token.return_value = mock_cognito_token_payload
-    
-        with patch.dict("utility.auth.VALIDATOR_MAP", {"cognito": mock_validator}):
-            client = TestClient(app)
-            yield client
+def teacher_user(group_id=None):
+    return SimpleNamespace(role=UserRole.teacher, group_id=group_id)
+
+def fake_group(group_id, **extra):
+    return SimpleNamespace(id=group_id, **extra)
 
-    app.dependency_overrides.clear()
+@pytest.fixture(scope="module")
+def client(router_client_factory):
+    # The cached AsyncClient talks to the app in-process; ASGITransport holds
+    # no loop-bound resources, so one instance serves every test's event loop.
+    return router_client_factory(router)
 
 # --- Test Update Group Details ---
 
-def test_update_group_details_success(client, monkeypatch):
+async def test_update_group_details_success(client, monkeypatch):
     """Test successful group update"""
     # Generate test data
-    group_id = uuid.uuid4()
+    group_id = GID
     update_data = {
         "name": "Updated Group Name",
         "description": "Updated description"
     }
     
     # Create mock objects
-    FakeUser = type("FakeUser", (), {"role": UserRole.admin, "group_id": group_id})
-    FakeGroup = type("FakeGroup", (), {"id": group_id, "name": "Updated Group Name"})
+    fake_user = admin_user(group_id)
+    group = fake_group(group_id, name="Updated Group Name")
     
     # Setup mocks
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: FakeUser())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: FakeGroup())
-    monkeypatch.setattr(groups, "update_group", lambda db, request, group: FakeGroup())
+    patch_attrs(
+        monkeypatch, groups,
+        get_user_by_cognito_id=lambda db, sub: fake_user,
+        get_group_by_id=lambda db, gid: group,
+        update_group=lambda db, request, current_group: group,
+    )
     
     # Call the endpoint
-    response = client.patch(f"/{group_id}", json=update_data)
+    response = await client.patch(f"/{group_id}", json=update_data)
     
     # Verify response
     assert response.status_code == 200
-    assert response.json()["group_name"] == "Updated Group Name"
-    assert str(group_id) in response.json()["group_id"]
-
-def test_update_group_not_found(client, monkeypatch):
-    """Test updating a non-existent group"""
-    # Generate test data
-    group_id = uuid.uuid4()
-    update_data = {
-        "name": "Updated Group Name",
-        "description": "Updated description"
-    }
-    
-    # Setup mocks to return None for the group
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: type("FakeUser", (), {"role": UserRole.admin})())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: None)
-    
-    # Call the endpoint
-    response = client.patch(f"/{group_id}", json=update_data)
-    
-    # Verify response
-    assert response.status_code == 404
-    assert "Group not found" in response.json()["detail"]
-
-def test_update_group_not_admin(client, monkeypatch):
-    """Test updating a group when user is not an admin"""
-    # Generate test data
-    group_id = uuid.uuid4()
-    update_data = {
-        "name": "Updated Group Name",
-        "description": "Updated description"
-    }
-    
-    # Create mock objects with teacher role
-    FakeUser = type("FakeUser", (), {"role": UserRole.teacher, "group_id": group_id})
-    FakeGroup = type("FakeGroup", (), {"id": group_id})
-    
-    # Setup mocks
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: FakeUser())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: FakeGroup())
-    
-    # Call the endpoint
-    response = client.patch(f"/{group_id}", json=update_data)
-    
-    # Verify response
-    assert response.status_code == 403
-    assert "Access denied" in response.json()["detail"]
+    body = response.json()
+    assert body["group_name"] == "Updated Group Name"
+    assert str(group_id) in body["group_id"]
 
-def test_update_group_different_group(client, monkeypatch):
+async def test_update_group_different_group(client, monkeypatch):
     """Test updating a group when user is in a different group"""
     # Generate test data
-    group_id = uuid.uuid4()
-    different_group_id = uuid.uuid4()
+    group_id = GID
+    different_group_id = OTHER_GID
     update_data = {
         "name": "Updated Group Name",
         "description": "Updated description"
     }
     
     # Create mock objects with different group_id
-    FakeUser = type("FakeUser", (), {"role": UserRole.admin, "group_id": different_group_id})
-    FakeGroup = type("FakeGroup", (), {"id": group_id})
+    fake_user = admin_user(different_group_id)
+    group = fake_group(group_id)
     
     # Setup mocks
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: FakeUser())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: FakeGroup())
+    patch_attrs(
+        monkeypatch, groups,
+        get_user_by_cognito_id=lambda db, sub: fake_user,
+        get_group_by_id=lambda db, gid: group,
+    )
     
     # Call the endpoint
-    response = client.patch(f"/{group_id}", json=update_data)
+    response = await client.patch(f"/{group_id}", json=update_data)
     
     # Verify response
     assert response.status_code == 403
@@ -146,158 +109,124 @@ def test_update_group_different_group(client, monkeypatch):
 
 # --- Test Set Group Admin ---
 
-def test_set_group_admin_success(client, monkeypatch):
+async def test_set_group_admin_success(client, monkeypatch):
     """Test successful admin role transfer"""
     # Generate test data
-    group_id = uuid.uuid4()
-    user_id = uuid.uuid4()
+    group_id = GID
+    user_id = UID
     request_data = {
         "user_id": str(user_id)
     }
     
     # Create mock objects
-    FakeUser = type("FakeUser", (), {"role": UserRole.admin, "group_id": group_id})
-    FakeTargetUser = type("FakeTargetUser", (), {"id": user_id, "group_id": group_id})
-    FakeGroup = type("FakeGroup", (), {"id": group_id})
+    fake_user = admin_user(group_id)
+    target_user = SimpleNamespace(id=user_id, group_id=group_id)
+    group = fake_group(group_id)
     
     # Setup mocks
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: FakeUser())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: FakeGroup())
-    monkeypatch.setattr(groups, "get_user", lambda db, uid: FakeTargetUser())
-    monkeypatch.setattr(groups, "set_user_role", lambda db, user, role: None)
+    patch_attrs(
+        monkeypatch, groups,
+        get_user_by_cognito_id=lambda db, sub: fake_user,
+        get_group_by_id=lambda db, gid: group,
+        get_user=lambda db, uid: target_user,
+        set_user_role=lambda db, user, role: None,
+    )
     
     # Call the endpoint
-    response = client.post(f"/{group_id}/admin", json=request_data)
+    response = await client.post(f"/{group_id}/admin", json=request_data)
     
     # Verify response
     assert response.status_code == 200
-    assert str(group_id) in response.json()["group_id"]
-    assert str(user_id) in response.json()["new_admin_user_id"]
+    body = response.json()
+    assert str(group_id) in body["group_id"]
+    assert str(user_id) in body["new_admin_user_id"]
 
-def test_set_group_admin_different_groups(client, monkeypatch):
+async def test_set_group_admin_different_groups(client, monkeypatch):
     """Test admin role transfer with different group_id for target user"""
     # Generate test data
-    group_id = uuid.uuid4()
-    user_id = uuid.uuid4()
+    group_id = GID
+    user_id = UID
     request_data = {
         "user_id": str(user_id)
     }
     
     # Create mock objects
-    FakeUser = type("FakeUser", (), {"role": UserRole.admin, "group_id": group_id})
-    FakeTargetUser = type("FakeTargetUser", (), {"id": user_id, "group_id": uuid.uuid4()})
-    FakeGroup = type("FakeGroup", (), {"id": group_id})
+    fake_user = admin_user(group_id)
+    target_user = SimpleNamespace(id=user_id, group_id=OTHER_GID)
+    group = fake_group(group_id)
     
     # Setup mocks
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: FakeUser())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: FakeGroup())
-    monkeypatch.setattr(groups, "get_user", lambda db, uid: FakeTargetUser())
-    monkeypatch.setattr(groups, "set_user_role", lambda db, user, role: None)
+    patch_attrs(
+        monkeypatch, groups,
+        get_user_by_cognito_id=lambda db, sub: fake_user,
+        get_group_by_id=lambda db, gid: group,
+        get_user=lambda db, uid: target_user,
+        set_user_role=lambda db, user, role: None,
+    )
     
     # Call the endpoint
-    response = client.post(f"/{group_id}/admin", json=request_data)
+    response = await client.post(f"/{group_id}/admin", json=request_data)
     
     # Verify response
     assert response.status_code == 403
     assert "Target user does not belong to the group" in response.json()["detail"]
 
-def test_set_group_admin_group_not_found(client, monkeypatch):
-    """Test setting admin for a non-existent group"""
-    # Generate test data
-    group_id = uuid.uuid4()
-    user_id = uuid.uuid4()
-    request_data = {
-        "user_id": str(user_id)
-    }
-    
-    # Setup mocks to return None for the group
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: type("FakeUser", (), {"role": UserRole.admin})())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: None)
-    
-    # Call the endpoint
-    response = client.post(f"/{group_id}/admin", json=request_data)
-    
-    # Verify response
-    assert response.status_code == 404
-    assert "Group not found" in response.json()["detail"]
-
-def test_set_group_admin_target_user_not_found(client, monkeypatch):
+async def test_set_group_admin_target_user_not_found(client, monkeypatch):
     """Test setting admin for a non-existent target user"""
     # Generate test data
-    group_id = uuid.uuid4()
-    user_id = uuid.uuid4()
+    group_id = GID
+    user_id = UID
     request_data = {
         "user_id": str(user_id)
     }
     
     # Setup mocks to return None for the target user
-    FakeUser = type("FakeUser", (), {"role": UserRole.admin, "group_id": group_id})
-    FakeGroup = type("FakeGroup", (), {"id": group_id})
+    fake_user = admin_user(group_id)
+    group = fake_group(group_id)
     
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: FakeUser())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: FakeGroup())
-    monkeypatch.setattr(groups, "get_user", lambda db, uid: None)
+    patch_attrs(
+        monkeypatch, groups,
+        get_user_by_cognito_id=lambda db, sub: fake_user,
+        get_group_by_id=lambda db, gid: group,
+        get_user=lambda db, uid: None,
+    )
     
     # Call the endpoint
-    response = client.post(f"/{group_id}/admin", json=request_data)
+    response = await client.post(f"/{group_id}/admin", json=request_data)
     
     # Verify response
     assert response.status_code == 404
     assert "Target user not found" in response.json()["detail"]
 
-def test_set_group_admin_not_admin(client, monkeypatch):
-    """Test setting admin when current user is not an admin"""
-    # Generate test data
-    group_id = uuid.uuid4()
-    user_id = uuid.uuid4()
-    request_data = {
-        "user_id": str(user_id)
-    }
-    
-    # Create mock objects with teacher role (non-admin)
-    FakeUser = type("FakeUser", (), {"role": UserRole.teacher, "group_id": group_id})
-    FakeTargetUser = type("FakeTargetUser", (), {"id": user_id})
-    FakeGroup = type("FakeGroup", (), {"id": group_id})
-    
-    # Setup mocks
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: FakeUser())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: FakeGroup())
-    monkeypatch.setattr(groups, "get_user", lambda db, uid: FakeTargetUser())
-    
-    # Call the endpoint
-    response = client.post(f"/{group_id}/admin", json=request_data)
-    
-    # Verify response
-    assert response.status_code == 403
-    assert "Access denied" in response.json()["detail"]
-
-def test_set_group_internal_error(client, monkeypatch):
+async def test_set_group_internal_error(client, monkeypatch):
     """Test internal server error during admin role transfer"""
     # Generate test data
-    group_id = uuid.uuid4()
-    user_id = uuid.uuid4()
+    group_id = GID
+    user_id = UID
     request_data = {
         "user_id": str(user_id)
     }
     
     # Create mock objects
-    FakeUser = type("FakeUser", (), {"role": UserRole.admin, "group_id": group_id})
-    FakeTargetUser = type("FakeTargetUser", (), {"id": user_id})
-    FakeGroup = type("FakeGroup", (), {"id": group_id})
-    
-    # Setup mocks
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: FakeUser())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: FakeGroup())
-    monkeypatch.setattr(groups, "get_user", lambda db, uid: FakeTargetUser())
+    fake_user = admin_user(group_id)
+    target_user = SimpleNamespace(id=user_id)
+    group = fake_group(group_id)
     
     # Set up mock to throw exception
     def mock_set_user_role(db, user, role):
         raise Exception("Database connection error")
     
-    monkeypatch.setattr(groups, "set_user_role", mock_set_user_role)
+    # Setup mocks
+    patch_attrs(
+        monkeypatch, groups,
+        get_user_by_cognito_id=lambda db, sub: fake_user,
+        get_group_by_id=lambda db, gid: group,
+        get_user=lambda db, uid: target_user,
+        set_user_role=mock_set_user_role,
+    )
     
     # Call the endpoint
-    response = client.post(f"/{group_id}/admin", json=request_data)
+    response = await client.post(f"/{group_id}/admin", json=request_data)
     
     # Verify response
     assert response.status_code == 500
@@ -305,150 +234,109 @@ def test_set_group_internal_error(client, monkeypatch):
 
 # --- Test Get Group Services ---
 
-def test_get_group_services_success(client, monkeypatch):
+async def test_get_group_services_success(client, monkeypatch):
     """Test successful retrieval of group services"""
     # Generate test data
-    group_id = uuid.uuid4()
+    group_id = GID
     
     # Create mock objects
-    FakeUser = type("FakeUser", (), {"role": UserRole.admin, "group_id": group_id})
-    FakeGroup = type("FakeGroup", (), {"id": group_id, "available_services": ["service1", "service2"]})
+    fake_user = admin_user(group_id)
+    group = fake_group(group_id, available_services=["service1", "service2"])
     
     # Setup mocks
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: FakeUser())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: FakeGroup())
+    patch_attrs(
+        monkeypatch, groups,
+        get_user_by_cognito_id=lambda db, sub: fake_user,
+        get_group_by_id=lambda db, gid: group,
+    )
     
     # Call the endpoint
-    response = client.get(f"/{group_id}/services")
+    response = await client.get(f"/{group_id}/services")
     
     # Verify response
     assert response.status_code == 200
     assert response.json()["services"] == ["service1", "service2"]
 
-def test_get_group_services_group_not_found(client, monkeypatch):
-    """Test getting services for a non-existent group"""
-    # Generate test data
-    group_id = uuid.uuid4()
-    
-    # Setup mocks to return None for the group
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: type("FakeUser", (), {"role": UserRole.admin})())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: None)
-    
-    # Call the endpoint
-    response = client.get(f"/{group_id}/services")
-    
-    # Verify response
-    assert response.status_code == 404
-    assert "Group not found" in response.json()["detail"]
-
 # --- Test Get Group Models ---
 
-def test_get_group_models_success(client, monkeypatch):
+async def test_get_group_models_success(client, monkeypatch):
     """Test successful retrieval of group models"""
     # Generate test data
-    group_id = uuid.uuid4()
+    group_id = GID
     
     # Create mock objects
-    FakeUser = type("FakeUser", (), {"role": UserRole.admin, "group_id": group_id})
-    FakeGroup = type("FakeGroup", (), {"id": group_id, "available_models": ["model1", "model2"]})
+    fake_user = admin_user(group_id)
+    group = fake_group(group_id, available_models=["model1", "model2"])
     
     # Setup mocks
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: FakeUser())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: FakeGroup())
+    patch_attrs(
+        monkeypatch, groups,
+        get_user_by_cognito_id=lambda db, sub: fake_user,
+        get_group_by_id=lambda db, gid: group,
+    )
     
     # Call the endpoint
-    response = client.get(f"/{group_id}/models")
+    response = await client.get(f"/{group_id}/models")
     
     # Verify response
     assert response.status_code == 200
     assert response.json()["models"] == ["model1", "model2"]
 
-def test_get_group_models_group_not_found(client, monkeypatch):
-    """Test getting models for a non-existent group"""
-    # Generate test data
-    group_id = uuid.uuid4()
-    
-    # Setup mocks to return None for the group
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: type("FakeUser", (), {"role": UserRole.admin})())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: None)
-    
-    # Call the endpoint
-    response = client.get(f"/{group_id}/models")
-    
-    # Verify response
-    assert response.status_code == 404
-    assert "Group not found" in response.json()["detail"]
-
 # --- Test Configure Group Services ---
 
-def test_configure_group_services_success(client, monkeypatch):
+async def test_configure_group_services_success(client, monkeypatch):
     """Test successful configuration of group services"""
     # Generate test data
-    group_id = uuid.uuid4()
+    group_id = GID
     request_data = {
-        "services_ids": [str(uuid.uuid4()), str(uuid.uuid4())]
+        "services_ids": [str(SERVICE_IDS[0]), str(SERVICE_IDS[1])]
     }
     
     # Create mock objects
-    FakeUser = type("FakeUser", (), {"role": UserRole.admin, "group_id": group_id})
-    FakeGroup = type("FakeGroup", (), {"id": group_id})
-    FakeService = type("FakeService", (), {"code": "service_code"})
-    FakeUpdatedGroup = type("FakeUpdatedGroup", (), {
-        "id": group_id,
-        "available_services": [FakeService(), FakeService()]
-    })
+    fake_user = admin_user(group_id)
+    group = fake_group(group_id)
+    service = SimpleNamespace(code="service_code")
+    updated_group = fake_group(group_id, available_services=[service, service])
     
     # Setup mocks
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: FakeUser())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: FakeGroup())
-    monkeypatch.setattr(groups, "get_services_by_ids", lambda db, sids: [FakeService(), FakeService()])
-    monkeypatch.setattr(groups, "set_group_available_services", lambda db, gid, services: FakeUpdatedGroup())
+    patch_attrs(
+        monkeypatch, groups,
+        get_user_by_cognito_id=lambda db, sub: fake_user,
+        get_group_by_id=lambda db, gid: group,
+        get_services_by_ids=lambda db, sids: [service, service],
+        set_group_available_services=lambda db, gid, services: updated_group,
+    )
     
     # Call the endpoint
-    response = client.put(f"/{group_id}/services", json=request_data)
+    response = await client.put(f"/{group_id}/services", json=request_data)
     
     # Verify response
     assert response.status_code == 200
-    assert str(group_id) in response.json()["updated_group_id"]
-    assert response.json()["updated_services"] == ["service_code", "service_code"]
-
-def test_configure_group_services_group_not_found(client, monkeypatch):
-    """Test configuring services for a non-existent group"""
-    # Generate test data
-    group_id = uuid.uuid4()
-    request_data = {
-        "services_ids": [str(uuid.uuid4())]
-    }
-    
-    # Setup mocks to return None for the group
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: type("FakeUser", (), {"role": UserRole.admin})())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: None)
-    
-    # Call the endpoint
-    response = client.put(f"/{group_id}/services", json=request_data)
-    
-    # Verify response
-    assert response.status_code == 404
-    assert "Group not found" in response.json()["detail"]
+    body = response.json()
+    assert str(group_id) in body["updated_group_id"]
+    assert body["updated_services"] == ["service_code", "service_code"]
 
-def test_configure_group_services_services_not_found(client, monkeypatch):
+async def test_configure_group_services_services_not_found(client, monkeypatch):
     """Test configuring with non-existent services"""
     # Generate test data
-    group_id = uuid.uuid4()
+    group_id = GID
     request_data = {
-        "services_ids": [str(uuid.uuid4())]
+        "services_ids": [str(SERVICE_IDS[0])]
     }
     
     # Setup mocks to return None for services
-    FakeUser = type("FakeUser", (), {"role": UserRole.admin, "group_id": group_id})
-    FakeGroup = type("FakeGroup", (), {"id": group_id})
+    fake_user = admin_user(group_id)
+    group = fake_group(group_id)
     
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: FakeUser())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: FakeGroup())
-    monkeypatch.setattr(groups, "get_services_by_ids", lambda db, sids: None)
+    patch_attrs(
+        monkeypatch, groups,
+        get_user_by_cognito_id=lambda db, sub: fake_user,
+        get_group_by_id=lambda db, gid: group,
+        get_services_by_ids=lambda db, sids: None,
+    )
     
     # Call the endpoint
-    response = client.put(f"/{group_id}/services", json=request_data)
+    response = await client.put(f"/{group_id}/services", json=request_data)
     
     # Verify response
     assert response.status_code == 404
@@ -456,56 +344,60 @@ def test_configure_group_services_services_not_found(client, monkeypatch):
 
 # --- Test Configure Group Models ---
 
-def test_configure_group_models_success(client, monkeypatch):
+async def test_configure_group_models_success(client, monkeypatch):
     """Test successful configuration of group models"""
     # Generate test data
-    group_id = uuid.uuid4()
+    group_id = GID
     model_id = 111
     request_data = {
         "models_ids": [model_id]
     }
     
     # Create mock objects
-    FakeUser = type("FakeUser", (), {"role": UserRole.admin, "group_id": group_id})
-    FakeGroup = type("FakeGroup", (), {"id": group_id})
-    FakeModel = type("FakeModel", (), {"id": model_id})
-    FakeUpdatedGroup = type("FakeUpdatedGroup", (), {
-        "id": group_id,
-        "available_models": [FakeModel()]
-    })
+    fake_user = admin_user(group_id)
+    group = fake_group(group_id)
+    model = SimpleNamespace(id=model_id)
+    updated_group = fake_group(group_id, available_models=[model])
     
     # Setup mocks
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: FakeUser())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: FakeGroup())
-    monkeypatch.setattr(groups, "get_ai_models_by_ids", lambda db, mids: [FakeModel()])
-    monkeypatch.setattr(groups, "set_group_available_models", lambda db, gid, models: FakeUpdatedGroup())
+    patch_attrs(
+        monkeypatch, groups,
+        get_user_by_cognito_id=lambda db, sub: fake_user,
+        get_group_by_id=lambda db, gid: group,
+        get_ai_models_by_ids=lambda db, mids: [model],
+        set_group_available_models=lambda db, gid, models: updated_group,
+    )
     
     # Call the endpoint
-    response = client.put(f"/{group_id}/models", json=request_data)
+    response = await client.put(f"/{group_id}/models", json=request_data)
     
     # Verify response
     assert response.status_code == 200
-    assert str(group_id) in response.json()["updated_group_id"]
-    assert model_id == response.json()["updated_models"][0]
+    body = response.json()
+    assert str(group_id) in body["updated_group_id"]
+    assert model_id == body["updated_models"][0]
 
-def test_configure_group_models_models_not_found(client, monkeypatch):
+async def test_configure_group_models_models_not_found(client, monkeypatch):
     """Test configuring with non-existent models"""
     # Generate test data
-    group_id = uuid.uuid4()
+    group_id = GID
     request_data = {
         "models_ids": [111]
     }
     
     # Setup mocks to return None for models
-    FakeUser = type("FakeUser", (), {"role": UserRole.admin, "group_id": group_id})
-    FakeGroup = type("FakeGroup", (), {"id": group_id})
+    fake_user = admin_user(group_id)
+    group = fake_group(group_id)
     
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: FakeUser())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: FakeGroup())
-    monkeypatch.setattr(groups, "get_ai_models_by_ids", lambda db, mids: None)
+    patch_attrs(
+        monkeypatch, groups,
+        get_user_by_cognito_id=lambda db, sub: fake_user,
+        get_group_by_id=lambda db, gid: group,
+        get_ai_models_by_ids=lambda db, mids: None,
+    )
     
     # Call the endpoint
-    response = client.put(f"/{group_id}/models", json=request_data)
+    response = await client.put(f"/{group_id}/models", json=request_data)
     
     # Verify response
     assert response.status_code == 404
@@ -513,76 +405,39 @@ def test_configure_group_models_models_not_found(client, monkeypatch):
 
 # --- Test Delete Group ---
 
-def test_delete_group_success(client, monkeypatch):
+async def test_delete_group_success(client, monkeypatch):
     """Test successful group deletion"""
     # Generate test data
-    group_id = uuid.uuid4()
+    group_id = GID
     
     # Create mock objects
-    FakeUser = type("FakeUser", (), {"role": UserRole.admin, "group_id": group_id})
-    FakeGroup = type("FakeGroup", (), {"id": group_id})
+    fake_user = admin_user(group_id)
+    group = fake_group(group_id)
     
     # Setup mocks
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: FakeUser())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: FakeGroup())
-    monkeypatch.setattr(groups, "delete_group_from_db", lambda db, group: None)
+    patch_attrs(
+        monkeypatch, groups,
+        get_user_by_cognito_id=lambda db, sub: fake_user,
+        get_group_by_id=lambda db, gid: group,
+        delete_group_from_db=lambda db, group: None,
+    )
     
     # Call the endpoint
-    response = client.delete(f"/{group_id}")
+    response = await client.delete(f"/{group_id}")
     
     # Verify response
     assert response.status_code == 200
     assert str(group_id) in response.json()["deleted_group_id"]
 
-def test_delete_group_not_found(client, monkeypatch):
-    """Test deleting a non-existent group"""
-    # Generate test data
-    group_id = uuid.uuid4()
-    
-    # Setup mocks to return None for the group
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: type("FakeUser", (), {"role": UserRole.admin})())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: None)
-    
-    # Call the endpoint
-    response = client.delete(f"/{group_id}")
-    
-    # Verify response
-    assert response.status_code == 404
-    assert "Group not found" in response.json()["detail"]
-
-def test_delete_group_not_admin(client, monkeypatch):
-    """Test deleting a group when user is not an admin"""
-    # Generate test data
-    group_id = uuid.uuid4()
-    
-    # Create mock objects with teacher role
-    FakeUser = type("FakeUser", (), {"role": UserRole.teacher, "group_id": group_id})
-    FakeGroup = type("FakeGroup", (), {"id": group_id})
-    
-    # Setup mocks
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: FakeUser())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: FakeGroup())
-    
-    # Call the endpoint
-    response = client.delete(f"/{group_id}")
-    
-    # Verify response
-    assert response.status_code == 403
-    assert "Access denied" in response.json()["detail"]
-
-def test_upload_group_logo_success(client, monkeypatch):
+async def test_upload_group_logo_success(client, monkeypatch):
     """Test successful logo upload"""
     # Generate test data
-    group_id = uuid.uuid4()
+    group_id = GID
     logo_s3_uri = "s3://bucket/groups/123/logo"
     
     # Create mock objects
-    FakeUser = type("FakeUser", (), {"role": UserRole.admin, "group_id": group_id})
-    FakeGroup = type("FakeGroup", (), {"id": group_id})
-    
-    # Setup mocks
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: FakeUser())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: FakeGroup())
+    fake_user = admin_user(group_id)
+    group = fake_group(group_id)
     
     async def mock_upload_file_to_s3(bucket, file_path, s3_path):
         return logo_s3_uri
@@ -590,146 +445,161 @@ def test_upload_group_logo_success(client, monkeypatch):
     async def mock_db_upload_group_logo(db, gid, uri):
         return None
     
-    monkeypatch.setattr(groups, "upload_file_to_s3", mock_upload_file_to_s3)
-    monkeypatch.setattr(groups, "db_upload_group_logo", mock_db_upload_group_logo)
-    
-    # Create a test file
-    with open("test_logo.png", "wb") as f:
-        f.write(b"test logo content")
-    
-    try:
-        # Call the endpoint
-        with open("test_logo.png", "rb") as f:
-            response = client.post(
-                f"/{group_id}/upload-logo",
-                files={"logo": ("test_logo.png", f, "image/png")}
-            )
-        
-        # Verify response
-        assert response.status_code == 200
-        assert response.json()["logo_s3_uri"] == logo_s3_uri
-    finally:
-        # Clean up test file
-        os.remove("test_logo.png")
-
-def test_upload_group_logo_group_not_found(client, monkeypatch):
+    # Setup mocks
+    patch_attrs(
+        monkeypatch, groups,
+        get_user_by_cognito_id=lambda db, sub: fake_user,
+        get_group_by_id=lambda db, gid: group,
+        upload_file_to_s3=mock_upload_file_to_s3,
+        db_upload_group_logo=mock_db_upload_group_logo,
+    )
+    
+    # Call the endpoint
+    response = await client.post(
+        f"/{group_id}/upload-logo",
+        files={"logo": ("test_logo.png", BytesIO(b"test logo content"), "image/png")}
+    )
+    
+    # Verify response
+    assert response.status_code == 200
+    assert response.json()["logo_s3_uri"] == logo_s3_uri
+
+async def test_upload_group_logo_group_not_found(client, monkeypatch):
     """Test uploading logo for a non-existent group"""
     # Generate test data
-    group_id = uuid.uuid4()
+    group_id = GID
     
     # Setup mocks to return None for the group
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: type("FakeUser", (), {"role": UserRole.admin})())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: None)
-    
-    # Create a test file
-    with open("test_logo.png", "wb") as f:
-        f.write(b"test logo content")
-    
-    try:
-        # Call the endpoint
-        with open("test_logo.png", "rb") as f:
-            response = client.post(
-                f"/{group_id}/upload-logo",
-                files={"logo": ("test_logo.png", f, "image/png")}
-            )
-        
-        # Verify response
-        assert response.status_code == 404
-        assert "Group not found" in response.json()["detail"]
-    finally:
-        # Clean up test file
-        os.remove("test_logo.png")
-
-def test_upload_group_logo_not_admin(client, monkeypatch):
+    patch_attrs(
+        monkeypatch, groups,
+        get_user_by_cognito_id=lambda db, sub: admin_user(),
+        get_group_by_id=lambda db, gid: None,
+    )
+    
+    # Call the endpoint
+    response = await client.post(
+        f"/{group_id}/upload-logo",
+        files={"logo": ("test_logo.png", BytesIO(b"test logo content"), "image/png")}
+    )
+    
+    # Verify response
+    assert response.status_code == 404
+    assert "Group not found" in response.json()["detail"]
+
+async def test_upload_group_logo_not_admin(client, monkeypatch):
     """Test uploading logo when user is not an admin"""
     # Generate test data
-    group_id = uuid.uuid4()
+    group_id = GID
     
     # Create mock objects with teacher role
-    FakeUser = type("FakeUser", (), {"role": UserRole.teacher, "group_id": group_id})
-    FakeGroup = type("FakeGroup", (), {"id": group_id})
+    fake_user = teacher_user(group_id)
+    group = fake_group(group_id)
     
     # Setup mocks
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: FakeUser())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: FakeGroup())
-    
-    # Create a test file
-    with open("test_logo.png", "wb") as f:
-        f.write(b"test logo content")
-    
-    try:
-        # Call the endpoint
-        with open("test_logo.png", "rb") as f:
-            response = client.post(
-                f"/{group_id}/upload-logo",
-                files={"logo": ("test_logo.png", f, "image/png")}
-            )
-        
-        # Verify response
-        assert response.status_code == 403
-        assert "Access denied" in response.json()["detail"]
-    finally:
-        # Clean up test file
-        os.remove("test_logo.png")
+    patch_attrs(
+        monkeypatch, groups,
+        get_user_by_cognito_id=lambda db, sub: fake_user,
+        get_group_by_id=lambda db, gid: group,
+    )
+    
+    # Call the endpoint
+    response = await client.post(
+        f"/{group_id}/upload-logo",
+        files={"logo": ("test_logo.png", BytesIO(b"test logo content"), "image/png")}
+    )
+    
+    # Verify response
+    assert response.status_code == 403
+    assert "Access denied" in response.json()["detail"]
 
 # --- Test Remove Group Logo ---
 
-def test_remove_group_logo_success(client, monkeypatch):
+async def test_remove_group_logo_success(client, monkeypatch):
     """Test successful logo removal"""
     # Generate test data
-    group_id = uuid.uuid4()
+    group_id = GID
     
     # Create mock objects
-    FakeUser = type("FakeUser", (), {"role": UserRole.admin, "group_id": group_id})
-    FakeGroup = type("FakeGroup", (), {"id": group_id})
-    
-    # Setup mocks
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: FakeUser())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: FakeGroup())
+    fake_user = admin_user(group_id)
+    group = fake_group(group_id)
     
     async def mock_db_upload_group_logo(db, gid, uri):
         return None
     
-    monkeypatch.setattr(groups, "db_upload_group_logo", mock_db_upload_group_logo)
+    # Setup mocks
+    patch_attrs(
+        monkeypatch, groups,
+        get_user_by_cognito_id=lambda db, sub: fake_user,
+        get_group_by_id=lambda db, gid: group,
+        db_upload_group_logo=mock_db_upload_group_logo,
+    )
     
     # Call the endpoint
-    response = client.delete(f"/{group_id}/remove-logo")
+    response = await client.delete(f"/{group_id}/remove-logo")
     
     # Verify response
     assert response.status_code == 200
     assert str(group_id) in response.json()["deleted_group_id"]
 
-def test_remove_group_logo_group_not_found(client, monkeypatch):
-    """Test removing logo for a non-existent group"""
+# --- Test Shared Group Guards ---
+
+_UPDATE_DATA = {"name": "Updated Group Name", "description": "Updated description"}
+_ADMIN_REQUEST = {"user_id": str(UID)}
+
+@pytest.mark.parametrize("method, path, kwargs", [
+    ("patch", "/{group_id}", {"json": _UPDATE_DATA}),
+    ("post", "/{group_id}/admin", {"json": _ADMIN_REQUEST}),
+    ("get", "/{group_id}/services", {}),
+    ("put", "/{group_id}/services", {"json": {"services_ids": [str(SERVICE_IDS[0])]}}),
+    ("get", "/{group_id}/models", {}),
+    ("delete", "/{group_id}", {}),
+    ("delete", "/{group_id}/remove-logo", {}),
+])
+async def test_group_not_found(client, monkeypatch, method, path, kwargs):
+    """Test that group endpoints return 404 for a non-existent group"""
     # Generate test data
-    group_id = uuid.uuid4()
+    group_id = GID
     
     # Setup mocks to return None for the group
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: type("FakeUser", (), {"role": UserRole.admin})())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: None)
+    patch_attrs(
+        monkeypatch, groups,
+        get_user_by_cognito_id=lambda db, sub: admin_user(),
+        get_group_by_id=lambda db, gid: None,
+        get_user=lambda db, uid: SimpleNamespace(id=uid),
+    )
     
     # Call the endpoint
-    response = client.delete(f"/{group_id}/remove-logo")
+    response = await getattr(client, method)(path.format(group_id=group_id), **kwargs)
     
     # Verify response
     assert response.status_code == 404
     assert "Group not found" in response.json()["detail"]
 
-def test_remove_group_logo_not_admin(client, monkeypatch):
-    """Test removing logo when user is not an admin"""
+@pytest.mark.parametrize("method, path, kwargs", [
+    ("patch", "/{group_id}", {"json": _UPDATE_DATA}),
+    ("post", "/{group_id}/admin", {"json": _ADMIN_REQUEST}),
+    ("delete", "/{group_id}", {}),
+    ("delete", "/{group_id}/remove-logo", {}),
+])
+async def test_group_not_admin(client, monkeypatch, method, path, kwargs):
+    """Test that group endpoints return 403 when the user is not an admin"""
     # Generate test data
-    group_id = uuid.uuid4()
+    group_id = GID
     
     # Create mock objects with teacher role
-    FakeUser = type("FakeUser", (), {"role": UserRole.teacher, "group_id": group_id})
-    FakeGroup = type("FakeGroup", (), {"id": group_id})
+    fake_user = teacher_user(group_id)
+    group = fake_group(group_id)
     
     # Setup mocks
-    monkeypatch.setattr(groups, "get_user_by_cognito_id", lambda db, sub: FakeUser())
-    monkeypatch.setattr(groups, "get_group_by_id", lambda db, gid: FakeGroup())
+    patch_attrs(
+        monkeypatch, groups,
+        get_user_by_cognito_id=lambda db, sub: fake_user,
+        get_group_by_id=lambda db, gid: group,
+        get_user=lambda db, uid: SimpleNamespace(id=uid),
+    )
     
     # Call the endpoint
-    response = client.delete(f"/{group_id}/remove-logo")
+    response = await getattr(client, method)(path.format(group_id=group_id), **kwargs)
     
     # Verify response
     assert response.status_code == 403
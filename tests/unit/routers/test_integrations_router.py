@@ -15,290 +15,142 @@
 # 
 
 import uuid
-from fastapi import FastAPI, HTTPException
-from fastapi.testclient import TestClient
-from unittest.mock import MagicMock, AsyncMock, patch
+import orjson
+from fastapi import HTTPException
 import pytest
 from datetime import datetime
 
-from database.models import UserRole, User, ThirdPartyIntegration
-from database import crud
-from utility.auth import oauth2_scheme
 from routers import integrations
-from routers.integrations import router, get_db
+from routers.integrations import router
+from tests.unit.routers._app import patch_attrs
 from database.schemas import (
     AllowedServiceName,
     ThirdPartyIntegrationUpdate,
 )
 
-app = FastAPI()
-app.include_router(router)
-
-@pytest.fixture(scope="function")
-def client(mock_cognito_token_payload):
-    app.dependency_overrides[get_db] = lambda: MagicMock()
-    app.dependency_overrides[oauth2_scheme] = lambda: "fake-jwt-token"
-
-    with patch("utility.auth.jose_jwt.get_unverified_claims") as mock_get_claims:
-        mock_get_claims.return_value = {"cognito:username": "dummy_user_id"}
-
-        mock_validator = AsyncMock()
-        mock_validator.validate_token.return_value = mock_cognito_token_payload
-    
-        with patch.dict("utility.auth.VALIDATOR_MAP", {"cognito": mock_validator}):
-            client = TestClient(app)
-            yield client
-
-    app.dependency_overrides.clear()
-
-# Common test fixtures
-@pytest.fixture
-def mock_admin_user():
-    admin = MagicMock(spec=User)
-    admin.id = str(uuid.uuid4())
-    admin.cognito_id = "mock_admin_id"
-    admin.role = UserRole.admin
-    admin.name = "Test Admin"
-    admin.email = "admin@example.com"
-    admin.is_active = True
-    return admin
-
-@pytest.fixture
-def mock_non_admin_user():
-    non_admin = MagicMock(spec=User)
-    non_admin.id = str(uuid.uuid4())
-    non_admin.cognito_id = "mock_user_id"
-    non_admin.role = UserRole.student
-    non_admin.name = "Test User"
-    non_admin.email = "user@example.com"
-    non_admin.is_active = True
-    return non_admin
-
-@pytest.fixture
-def mock_integration():
-    # Create a proper ThirdPartyIntegration model instance
-    integration = MagicMock(spec=ThirdPartyIntegration)
-    integration.id = uuid.uuid4()
-    integration.service_name = AllowedServiceName.GOOGLE.value
+pytestmark = pytest.mark.asyncio
+
+@pytest.fixture(scope="module")
+def client(router_client_factory):
+    # Resolved once per module; the router's dependencies are patched per
+    # test and unwind with the function-scoped monkeypatch.
+    return router_client_factory(router)
+
+# Serialised integration returned by the mocked CRUD calls. A plain dict
+# validates straight into the response models, with no attribute lookups.
+# Fixed timestamp: the tests never compare it, so no clock read is needed.
+_NOW_ISO = datetime(2025, 1, 1, 12, 0).isoformat()
+_INTEGRATION_DICT = {
+    "id": str(uuid.uuid4()),
+    "service_name": AllowedServiceName.GOOGLE.value,
     # service_value should be a dict according to schema
-    integration.service_value = {
+    "service_value": {
         "client_id": "test_client_id",
         "client_secret": "test_client_secret",
         "redirect_uri": "http://localhost:3000/auth/callback"
+    },
+    "is_active": True,
+    "created_at": _NOW_ISO,
+    "updated_at": _NOW_ISO,
+}
+
+# Fixed ID for requests whose target is never looked up for real.
+MISSING_ID = str(uuid.UUID(int=404))
+
+# Request body shared by every update test, validated once at import.
+UPDATE_PAYLOAD = ThirdPartyIntegrationUpdate(
+    service_value={
+        "client_id": "new_client_id",
+        "client_secret": "new_client_secret",
+        "redirect_uri": "http://localhost:3000/auth/callback"
     }
-    integration.is_active = True
-    integration.created_at = datetime.now()
-    integration.updated_at = datetime.now()
-    
-    # Add dict-like behavior for response serialization
-    def to_dict():
-        return {
-            "id": str(integration.id),  # Convert UUID to string
-            "service_name": integration.service_name,
-            "service_value": integration.service_value,
-            "is_active": integration.is_active,
-            "created_at": integration.created_at.isoformat(),
-            "updated_at": integration.updated_at.isoformat()
-        }
-    
-    integration.dict = to_dict
-    integration.__dict__.update(to_dict())
-    
-    # Add model_dump for Pydantic v2 compatibility
-    integration.model_dump = to_dict
-    
-    return integration
+).model_dump()
+
+def _returning(value):
+    """Build a bare coroutine stub for a CRUD call; no test inspects its calls."""
+    async def _stub(*args, **kwargs):
+        return value
+    return _stub
+
+def _raise_403(*args, **kwargs):
+    raise HTTPException(status_code=403, detail="Not authorized")
+
+# Common test fixtures
+@pytest.fixture
+def admin_context(monkeypatch):
+    """Fixture to monkeypatch for a verified admin user context."""
+    monkeypatch.setattr(integrations, "verify_user_admin", 
+                       lambda db, user: None)  # No exception means admin is verified
 
 @pytest.fixture
-def non_admin_context(monkeypatch, mock_non_admin_user):
+def non_admin_context(monkeypatch):
     """Fixture to monkeypatch for non-admin user context and set dependency override."""
-    def raise_403_error(*args, **kwargs):
-        raise HTTPException(status_code=403, detail="Not authorized")
-    monkeypatch.setattr(crud, "get_user_by_cognito_id", 
-                       lambda db, user_id: mock_non_admin_user)
-    monkeypatch.setattr(integrations, "verify_user_admin", raise_403_error)
+    monkeypatch.setattr(integrations, "verify_user_admin", _raise_403)
 
-def test_get_available_services(client):
+async def test_get_available_services(client):
     """Test getting list of available services"""
-    response = client.get("/services")
+    response = await client.get("/services")
     assert response.status_code == 200
     services = response.json()
     assert isinstance(services, list)
     assert len(services) > 0
     assert AllowedServiceName.GOOGLE.value in services
 
-def test_read_integrations_success(client, monkeypatch, mock_admin_user, mock_integration):
+async def test_read_integrations_success(client, admin_context, monkeypatch):
     """Test successful retrieval of all integrations by admin"""
-    # Mock the user verification and database functions
-    monkeypatch.setattr(crud, "get_user_by_cognito_id", 
-                       lambda db, user_id: mock_admin_user)
-    monkeypatch.setattr(integrations, "verify_user_admin", 
-                       lambda db, user: None)  # No exception means admin is verified
     monkeypatch.setattr(integrations, "get_third_party_integrations", 
-                       AsyncMock(return_value=[mock_integration]))
+                       _returning([_INTEGRATION_DICT]))
     
-    response = client.get("/")
+    response = await client.get("/")
     assert response.status_code == 200
     integrations_list = response.json()
     assert isinstance(integrations_list, list)
     assert len(integrations_list) == 1
     assert integrations_list[0]["service_name"] == AllowedServiceName.GOOGLE.value
 
-def test_read_integrations_non_admin(client, non_admin_context):
-    """Test that non-admin users cannot access integrations"""
-    response = client.get("/")
-    assert response.status_code == 403
-    assert "Not authorized" in response.json()["detail"]
-
-def test_read_integration_by_service_success(client, monkeypatch, mock_admin_user, mock_integration):
-    """Test successful retrieval of integration by service name"""
-    # Mock the user verification and database functions
-    monkeypatch.setattr(crud, "get_user_by_cognito_id", 
-                       lambda db, user_id: mock_admin_user)
-    monkeypatch.setattr(integrations, "verify_user_admin", 
-                       lambda db, user: None)  # No exception means admin is verified
-    monkeypatch.setattr(integrations, "get_third_party_integration_by_service", 
-                       AsyncMock(return_value=mock_integration))
-    
-    response = client.get(f"/service/{AllowedServiceName.GOOGLE.value}")
-    assert response.status_code == 200
-    integration = response.json()
-    assert "service_value" in integration
-    assert isinstance(integration["service_value"], dict)
-    assert integration["service_value"] == mock_integration.service_value
-
-def test_read_integration_by_service_not_found(client, monkeypatch, mock_admin_user):
-    """Test handling of non-existent integration service"""
-    # Mock the user verification and database functions
-    monkeypatch.setattr(crud, "get_user_by_cognito_id", 
-                       lambda db, user_id: mock_admin_user)
-    monkeypatch.setattr(integrations, "verify_user_admin", 
-                       lambda db, user: None)  # No exception means admin is verified
-    monkeypatch.setattr(integrations, "get_third_party_integration_by_service", 
-                       AsyncMock(return_value=None))
-    
-    response = client.get(f"/service/{AllowedServiceName.GOOGLE.value}")
-    assert response.status_code == 404
-    assert "Integration not found" in response.json()["detail"]
-
-def test_read_public_integration_by_service_success(client, monkeypatch, mock_integration):
-    """Test successful public access to integration service"""
-    monkeypatch.setattr(integrations, "get_third_party_integration_by_service", 
-                       AsyncMock(return_value=mock_integration))
-    
-    response = client.get(f"/public/service/{AllowedServiceName.GOOGLE.value}")
-    assert response.status_code == 200
-    integration = response.json()
-    assert "service_value" in integration
-    assert isinstance(integration["service_value"], dict)
-    assert integration["service_value"] == mock_integration.service_value
-
-def test_read_public_integration_by_service_not_found(client, monkeypatch):
-    """Test handling of non-existent public integration service"""
-    monkeypatch.setattr(integrations, "get_third_party_integration_by_service", 
-                       AsyncMock(return_value=None))
-    
-    response = client.get(f"/public/service/{AllowedServiceName.GOOGLE.value}")
-    assert response.status_code == 404
-    assert "Integration not found" in response.json()["detail"]
-
-def test_update_integration_success(client, monkeypatch, mock_admin_user, mock_integration):
-    """Test successful update of integration by admin"""
-    # Mock the user verification and database functions
-    monkeypatch.setattr(crud, "get_user_by_cognito_id", 
-                       lambda db, user_id: mock_admin_user)
-    monkeypatch.setattr(integrations, "verify_user_admin", 
-                       lambda db, user: None)  # No exception means admin is verified
-    monkeypatch.setattr(integrations, "get_third_party_integration", 
-                       AsyncMock(return_value=mock_integration))
-    monkeypatch.setattr(integrations, "update_third_party_integration", 
-                       AsyncMock(return_value=mock_integration))
-    
-    # Create a proper update request that matches ThirdPartyIntegrationUpdate schema
-    update_data = ThirdPartyIntegrationUpdate(
-        service_value={
-            "client_id": "new_client_id",
-            "client_secret": "new_client_secret",
-            "redirect_uri": "http://localhost:3000/auth/callback"
-        }
-    ).model_dump()
-    
-    response = client.put(f"/{mock_integration.id}", json=update_data)
-    assert response.status_code == 200
-    integration = response.json()
-    assert "service_value" in integration
-    assert isinstance(integration["service_value"], dict)
-    assert integration["service_value"] == mock_integration.service_value
-
-def test_update_integration_not_found(client, monkeypatch, mock_admin_user):
-    """Test handling of update for non-existent integration"""
-    # Mock the user verification and database functions
-    monkeypatch.setattr(crud, "get_user_by_cognito_id", 
-                       lambda db, user_id: mock_admin_user)
-    monkeypatch.setattr(integrations, "verify_user_admin", 
-                       lambda db, user: None)  # No exception means admin is verified
-    monkeypatch.setattr(integrations, "get_third_party_integration", 
-                       AsyncMock(return_value=None))
-    
-    # Create a proper update request that matches ThirdPartyIntegrationUpdate schema
-    update_data = ThirdPartyIntegrationUpdate(
-        service_value={
-            "client_id": "new_client_id",
-            "client_secret": "new_client_secret",
-            "redirect_uri": "http://localhost:3000/auth/callback"
-        }
-    ).model_dump()
-    
-    response = client.put(f"/{uuid.uuid4()}", json=update_data)
-    assert response.status_code == 404
-    assert "Integration not found" in response.json()["detail"]
-
-def test_update_integration_non_admin(client, non_admin_context):
-    """Test that non-admin users cannot update integrations"""
-    # Create a proper update request that matches ThirdPartyIntegrationUpdate schema
-    update_data = ThirdPartyIntegrationUpdate(
-        service_value={
-            "client_id": "new_client_id",
-            "client_secret": "new_client_secret",
-            "redirect_uri": "http://localhost:3000/auth/callback"
-        }
-    ).model_dump()
-    response = client.put(f"/{uuid.uuid4()}", json=update_data)
-    assert response.status_code == 403
-    assert "Not authorized" in response.json()["detail"]
-
-def test_delete_integration_success(client, monkeypatch, mock_admin_user, mock_integration):
-    """Test successful deletion of integration by admin"""
-    # Mock the user verification and database functions
-    monkeypatch.setattr(crud, "get_user_by_cognito_id", 
-                       lambda db, user_id: mock_admin_user)
-    monkeypatch.setattr(integrations, "verify_user_admin", 
-                       lambda db, user: None)  # No exception means admin is verified
-    monkeypatch.setattr(integrations, "get_third_party_integration", 
-                       AsyncMock(return_value=mock_integration))
-    monkeypatch.setattr(integrations, "delete_third_party_integration", 
-                       AsyncMock(return_value=True))
-    
-    response = client.delete(f"/{mock_integration.id}")
-    assert response.status_code == 200
-    assert response.json()["message"] == "Integration deleted successfully"
-
-def test_delete_integration_not_found(client, monkeypatch, mock_admin_user):
-    """Test handling of deletion for non-existent integration"""
-    # Mock the user verification and database functions
-    monkeypatch.setattr(crud, "get_user_by_cognito_id", 
-                       lambda db, user_id: mock_admin_user)
-    monkeypatch.setattr(integrations, "verify_user_admin", 
-                       lambda db, user: None)  # No exception means admin is verified
-    monkeypatch.setattr(integrations, "get_third_party_integration", 
-                       AsyncMock(return_value=None))
-    
-    response = client.delete(f"/{uuid.uuid4()}")
-    assert response.status_code == 404
-    assert "Integration not found" in response.json()["detail"]
-
-def test_delete_integration_non_admin(client, non_admin_context):
-    """Test that non-admin users cannot delete integrations"""
-    response = client.delete(f"/{uuid.uuid4()}")
+# --- Shared lookup and error cases ---
+
+_SERVICE_PATH = f"/service/{AllowedServiceName.GOOGLE.value}"
+_PUBLIC_SERVICE_PATH = f"/public/service/{AllowedServiceName.GOOGLE.value}"
+# Expected bodies as raw bytes: FastAPI's compact JSON output matches
+# orjson.dumps for these payloads, so no decode is needed to compare.
+_SERVICE_VALUE_BODY = orjson.dumps({"service_value": _INTEGRATION_DICT["service_value"]})
+_DELETED_BODY = b'{"message":"Integration deleted successfully"}'
+_NOT_FOUND_BODY = b'{"detail":"Integration not found"}'
+
+@pytest.mark.parametrize("method, path, kwargs, stored, status, body", [
+    ("get", _SERVICE_PATH, {}, _INTEGRATION_DICT, 200, _SERVICE_VALUE_BODY),
+    ("get", _SERVICE_PATH, {}, None, 404, _NOT_FOUND_BODY),
+    ("get", _PUBLIC_SERVICE_PATH, {}, _INTEGRATION_DICT, 200, _SERVICE_VALUE_BODY),
+    ("get", _PUBLIC_SERVICE_PATH, {}, None, 404, _NOT_FOUND_BODY),
+    ("put", "/{id}", {"json": UPDATE_PAYLOAD}, _INTEGRATION_DICT, 200, _SERVICE_VALUE_BODY),
+    ("put", "/{id}", {"json": UPDATE_PAYLOAD}, None, 404, _NOT_FOUND_BODY),
+    ("delete", "/{id}", {}, _INTEGRATION_DICT, 200, _DELETED_BODY),
+    ("delete", "/{id}", {}, None, 404, _NOT_FOUND_BODY),
+])
+async def test_integration_lookup(client, admin_context, monkeypatch, method, path, kwargs, stored, status, body):
+    """Test reading, updating and deleting an integration that exists or not"""
+    # Every lookup returns the same stored value; the writes only run once
+    # the lookup has found the integration.
+    patch_attrs(
+        monkeypatch, integrations,
+        get_third_party_integration_by_service=_returning(stored),
+        get_third_party_integration=_returning(stored),
+        update_third_party_integration=_returning(_INTEGRATION_DICT),
+        delete_third_party_integration=_returning(True),
+    )
+    
+    response = await getattr(client, method)(path.format(id=_INTEGRATION_DICT["id"]), **kwargs)
+    assert response.status_code == status
+    assert response.content == body
+
+@pytest.mark.parametrize("method, path, kwargs", [
+    ("get", "/", {}),
+    ("put", "/{id}", {"json": UPDATE_PAYLOAD}),
+    ("delete", "/{id}", {}),
+])
+async def test_integration_non_admin(client, non_admin_context, method, path, kwargs):
+    """Test that non-admin users cannot read, update or delete integrations"""
+    response = await getattr(client, method)(path.format(id=MISSING_ID), **kwargs)
     assert response.status_code == 403
-    assert "Not authorized" in response.json()["detail"]
\ No newline at end of file
+    assert response.content == b'{"detail":"Not authorized"}'
\ No newline at end of file
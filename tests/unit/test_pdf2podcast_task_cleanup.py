@@ -17,41 +17,30 @@
 import pytest
 from fastapi import HTTPException
 from tasks import pdf2podcast_task
-from unittest.mock import AsyncMock
 
-@pytest.mark.asyncio
-async def test_cleanup_s3_files_both_present(monkeypatch):
-    calls = []
-
-    fake_delete_from_s3 = AsyncMock(side_effect=lambda bucket, uri: calls.append((bucket, uri)))
-
-    monkeypatch.setattr(pdf2podcast_task, "delete_from_s3", fake_delete_from_s3)
-    await pdf2podcast_task.cleanup_s3_files("s3://test_audio", "s3://test_image")
-    assert calls == [("podcast", "s3://test_audio"), ("podcast", "s3://test_image")]
-
-@pytest.mark.asyncio
-async def test_cleanup_s3_files_audio_only(monkeypatch):
+@pytest.fixture
+def patched_delete_from_s3(monkeypatch):
+    # Records every (bucket, uri) pair cleanup_s3_files asks to delete
     calls = []
 
     async def fake_delete_from_s3(bucket, uri):
         calls.append((bucket, uri))
 
     monkeypatch.setattr(pdf2podcast_task, "delete_from_s3", fake_delete_from_s3)
-    await pdf2podcast_task.cleanup_s3_files("s3://test_audio", "")
-    assert calls == [("podcast", "s3://test_audio")]
-
-@pytest.mark.asyncio
-async def test_cleanup_s3_files_image_only(monkeypatch):
-    calls = []
-
-    async def fake_delete_from_s3(bucket, uri):
-        calls.append((bucket, uri))
-
-    monkeypatch.setattr(pdf2podcast_task, "delete_from_s3", fake_delete_from_s3)
-    await pdf2podcast_task.cleanup_s3_files("", "s3://test_image")
-    assert calls == [("podcast", "s3://test_image")]
-
-@pytest.mark.asyncio
+    return calls
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("audio_uri,image_uri,expected", [
+    pytest.param("s3://test_audio", "s3://test_image",
+                 [("podcast", "s3://test_audio"), ("podcast", "s3://test_image")], id="both_present"),
+    pytest.param("s3://test_audio", "", [("podcast", "s3://test_audio")], id="audio_only"),
+    pytest.param("", "s3://test_image", [("podcast", "s3://test_image")], id="image_only"),
+])
+async def test_cleanup_s3_files(patched_delete_from_s3, audio_uri, image_uri, expected):
+    await pdf2podcast_task.cleanup_s3_files(audio_uri, image_uri)
+    assert patched_delete_from_s3 == expected
+
+@pytest.mark.anyio
 async def test_cleanup_s3_files_exception(monkeypatch):
     async def fake_delete_from_s3(bucket, uri):
         raise Exception("Fake deletion error")
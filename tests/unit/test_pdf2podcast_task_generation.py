@@ -19,6 +19,7 @@ from fastapi import HTTPException
 from tasks import pdf2podcast_task
 import json
 from datetime import datetime
+from types import SimpleNamespace
 from uuid import uuid4
 from database.schemas import PodcastStatus
 
@@ -40,24 +41,23 @@ async def fake_generate_audio(dialogue, language):
 async def fake_generate_podcast_image(transcript):
     return ("Test image prompt", "s3://image")
 
-# Lists to record update calls
-update_status_calls = []
-update_podcast_calls = []
+@pytest.fixture
+def fake_pdf2podcast_env(monkeypatch):
+    """
+    Patch the task's external dependencies with the fakes above.
 
-def fake_update_podcast_status(db, podcast_id, status):
-    update_status_calls.append((podcast_id, status))
+    The database updates are recorded in the returned namespace, which is
+    built per test so no calls leak from one test to the next. Tests patch
+    on top of this for the step they want to fail.
+    """
+    env = SimpleNamespace(status_calls=[], podcast_calls=[])
 
-def fake_update_podcast(db, podcast_id, podcast_info):
-    update_podcast_calls.append((podcast_id, podcast_info))
+    def fake_update_podcast_status(db, podcast_id, status):
+        env.status_calls.append((podcast_id, status))
 
+    def fake_update_podcast(db, podcast_id, podcast_info):
+        env.podcast_calls.append((podcast_id, podcast_info))
 
-@pytest.mark.asyncio
-async def test_process_generate_podcast_success(monkeypatch):
-    # Clear call recording lists
-    update_status_calls.clear()
-    update_podcast_calls.clear()
-
-    # Patch external dependencies with our fakes.
     monkeypatch.setattr(pdf2podcast_task, "generate_claude_prompt", fake_generate_claude_prompt)
     monkeypatch.setattr(pdf2podcast_task, "invoke_bedrock_model", fake_invoke_bedrock_model)
     monkeypatch.setattr(pdf2podcast_task, "clean_dialogue", fake_clean_dialogue)
@@ -65,6 +65,12 @@ async def test_process_generate_podcast_success(monkeypatch):
     monkeypatch.setattr(pdf2podcast_task, "generate_podcast_image", fake_generate_podcast_image)
     monkeypatch.setattr(pdf2podcast_task, "update_podcast_status", fake_update_podcast_status)
     monkeypatch.setattr(pdf2podcast_task, "update_podcast", fake_update_podcast)
+    return env
+
+@pytest.mark.anyio
+async def test_process_generate_podcast_success(fake_pdf2podcast_env):
+    update_status_calls = fake_pdf2podcast_env.status_calls
+    update_podcast_calls = fake_pdf2podcast_env.podcast_calls
 
     dummy_db = {}
     dummy_podcast_id = uuid4()
@@ -95,24 +101,15 @@ async def test_process_generate_podcast_success(monkeypatch):
     assert isinstance(podcast_info.completed_at, datetime)
 
 
-@pytest.mark.asyncio
-async def test_process_generate_podcast_failure(monkeypatch):
-    # Clear call recording lists
-    update_status_calls.clear()
-    update_podcast_calls.clear()
-
-    # Patch functions similar to success, except make generate_audio raise exception.
-    monkeypatch.setattr(pdf2podcast_task, "generate_claude_prompt", fake_generate_claude_prompt)
-    monkeypatch.setattr(pdf2podcast_task, "invoke_bedrock_model", fake_invoke_bedrock_model)
-    monkeypatch.setattr(pdf2podcast_task, "clean_dialogue", fake_clean_dialogue)
+@pytest.mark.anyio
+async def test_process_generate_podcast_failure(fake_pdf2podcast_env, monkeypatch):
+    update_podcast_calls = fake_pdf2podcast_env.podcast_calls
 
+    # Same fakes as the success case, except generate_audio raises.
     async def failing_generate_audio(dialogue, language):
         raise RuntimeError("Audio generation failed")
 
     monkeypatch.setattr(pdf2podcast_task, "generate_audio", failing_generate_audio)
-    monkeypatch.setattr(pdf2podcast_task, "generate_podcast_image", fake_generate_podcast_image)
-    monkeypatch.setattr(pdf2podcast_task, "update_podcast_status", fake_update_podcast_status)
-    monkeypatch.setattr(pdf2podcast_task, "update_podcast", fake_update_podcast)
 
     # Patch cleanup_s3_files to record its call
     cleanup_calls = []